@@ -15,6 +15,7 @@ except ImportError:
     import casadi
 import pyomeca
 from .biorbd_vtk import VtkModel, VtkWindow, Mesh, Rototrans
+from .mesh import merge_duplicated_vertices
 from PyQt5.QtWidgets import (
     QSlider,
     QVBoxLayout,
@@ -445,6 +446,7 @@ class Viz:
         # Create all the reference to the things to plot
         self.nQ = self.model.nbQ()
         self.Q = np.zeros(self.nQ)
+        self.muscles_q = None
         if self.show_markers:
             self.Markers = InterfacesCollections.Markers(self.model)
             self.markers = Markers(np.ndarray((3, self.model.nbMarkers(), 1)))
@@ -464,6 +466,7 @@ class Viz:
             self.segments_center_of_mass = Markers(np.ndarray((3, self.model.nbSegment(), 1)))
         if self.show_meshes:
             self.mesh = []
+            self.mesh_vertex_index = []
             self.meshPointsInMatrix = InterfacesCollections.MeshPointsInMatrix(self.model)
             for i, vertices in enumerate(self.meshPointsInMatrix.get_data(Q=self.Q, compute_kin=False)):
                 triangles = (
@@ -471,7 +474,11 @@ class Viz:
                     if len(self.model.meshFaces()[i])
                     else np.ndarray((0, 3), dtype="int32")
                 )
-                self.mesh.append(Mesh(vertex=vertices, triangles=triangles.T))
+
+                # The segments being rigid, the duplicated vertices of their mesh are only kept and drawn once
+                vertices, triangles, vertex_index = merge_duplicated_vertices(vertices, triangles.T)
+                self.mesh_vertex_index.append(vertex_index)
+                self.mesh.append(Mesh(vertex=vertices, triangles=triangles))
         if self.show_muscles:
             self.model.updateMuscles(self.Q, True)
             self.muscles = []
@@ -592,7 +599,12 @@ class Viz:
         self.Q = Q
 
         self.model.UpdateKinematicsCustom(self.Q)
-        if self.show_muscles:
+
+        # The muscles and their wrappings only depend on Q, so they are left untouched if Q did not change since they
+        # were last computed (a copy is kept since the sliders modify Q in place)
+        muscles_moved = self.muscles_q is None or not np.array_equal(self.muscles_q, self.Q)
+        self.muscles_q = np.array(self.Q)
+        if self.show_muscles and muscles_moved:
             self.__set_muscles_from_q()
         if self.show_local_ref_frame:
             self.__set_rt_from_q()
@@ -614,7 +626,7 @@ class Viz:
             self.__set_contacts_from_q()
         if self.show_soft_contacts:
             self.__set_soft_contacts_from_q()
-        if self.show_wrappings:
+        if self.show_wrappings and muscles_moved:
             self.__set_wrapping_from_q()
 
         # Update the sliders
@@ -962,21 +974,31 @@ class Viz:
             options = QFileDialog.Options()
             options |= QFileDialog.DontUseNativeDialog
             file_name = QFileDialog.getSaveFileName(
-                self.vtk_window, "Save the video", "", "OGV files (*.ogv)", options=options
+                self.vtk_window, "Save the video", "", "MP4 files (*.mp4)", options=options
             )
             file_name, file_extension = os.path.splitext(file_name[0])
             if file_name == "":
                 return
-            file_name += ".ogv"
+            file_name += ".mp4"
+
+        try:
+            self.vtk_window.record(
+                button_to_block=[self.record_push_button, self.stop_record_push_button],
+                finish=finish,
+                file_name=file_name,
+            )
+        except RuntimeError as e:
+            self.is_recording = False
+            self.record_push_button.setIcon(self.record_icon)
+            self.stop_record_push_button.setEnabled(False)
+            QMessageBox.warning(self.vtk_window, "Recording failed", str(e))
+            return
 
+        if file_name:
             self.record_push_button.setIcon(self.add_icon)
             self.stop_record_push_button.setEnabled(True)
             self.is_recording = True
 
-        self.vtk_window.record(
-            button_to_block=[self.record_push_button, self.stop_record_push_button], finish=finish, file_name=file_name
-        )
-
         if finish:
             self.is_recording = False
             self.record_push_button.setIcon(self.record_icon)
@@ -1190,6 +1212,8 @@ class Viz:
 
     def __set_meshes_from_q(self):
         for m, meshes in enumerate(self.meshPointsInMatrix.get_data(Q=self.Q, compute_kin=False)):
+            if self.mesh_vertex_index[m] is not None:
+                meshes = meshes[:, self.mesh_vertex_index[m], :]
             self.mesh[m][0:3, :, :] = meshes
         self.vtk_model.update_mesh(self.mesh)
 
@@ -1201,7 +1225,8 @@ class Viz:
             for muscle_idx in range(self.model.muscleGroup(group_idx).nbMuscles()):
                 musc = self.model.muscleGroup(group_idx).muscle(muscle_idx)
                 for k, pts in enumerate(musc.position().musclesPointsInGlobal()):
-                    self.muscles[idx].loc[{"channel": k, "time": 0}] = np.append(muscles[cmp], 1)
+                    # Write in the underlying array of the mesh, its homogeneous row is already filled with ones
+                    self.muscles[idx].data[0:3, k, 0] = np.ravel(muscles[cmp])
                     cmp += 1
                 idx += 1
         self.vtk_model.update_muscle(self.muscles)
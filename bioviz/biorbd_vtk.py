@@ -2,28 +2,31 @@
 Visualization toolkit in pyomeca
 """
 
-import time
 import sys
+import subprocess
+from queue import Queue
+from threading import Thread
 
 import numpy as np
 from PyQt5 import QtWidgets
+from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import QPalette, QColor
 
 from vtk import (
     vtkActor,
     vtkCellArray,
+    vtkGlyph3DMapper,
+    vtkPointGaussianMapper,
     vtkInteractorStyleTrackballCamera,
     vtkLine,
     vtkPoints,
     vtkPolyData,
     vtkPolyDataMapper,
-    vtkPolyLine,
+    vtkProperty,
     vtkRenderer,
     vtkSphereSource,
     vtkUnsignedCharArray,
-    vtkOggTheoraWriter,
     vtkWindowToImageFilter,
-    vtkPolygon,
     vtkExtractEdges,
     vtkArrowSource,
     vtkNamedColors,
@@ -36,14 +39,13 @@ from vtk import (
 )
 
 from vtk.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
+from vtk.util import numpy_support
 
 from pyomeca import Markers, Rototrans
 from .mesh import Mesh
 
-first = True
-if first:
-    app = QtWidgets.QApplication(sys.argv)
-    first = False
+# Reuse the running application if any (e.g. when the module is reloaded), as Qt only allows one per process
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
 
 
 class VtkWindow(QtWidgets.QMainWindow):
@@ -77,7 +79,12 @@ class VtkWindow(QtWidgets.QMainWindow):
         self.main_layout = QtWidgets.QGridLayout()
         self.main_layout.addWidget(self.avatar_widget)
         self.frame.setLayout(self.main_layout)
-        self.video_recorder = vtkOggTheoraWriter()
+        self.video_recorder = None
+        self._video_image_filter = None
+        self._video_frames = None
+        self._free_video_frames = None
+        self._video_writer = None
+        self._video_error = None
         self.is_fixed_sized = False
         self.minimum_size = self.minimumSize()
         self.maximum_size = self.maximumSize()
@@ -86,6 +93,7 @@ class VtkWindow(QtWidgets.QMainWindow):
         app._in_event_loop = True
         self.is_active = True
         self.should_reset_camera = False
+        self._render_pending = False
         app.processEvents()
 
     def closeEvent(self, event):
@@ -94,20 +102,34 @@ class VtkWindow(QtWidgets.QMainWindow):
         """
         self.is_active = False
         app._in_event_loop = False
-        # It seems that interactor closes slower than the windows preventing from properly closing the interface.
-        # The work-around is to wait a little bit
-        time.sleep(0.1)
-        super()
+        # Close the video being recorded, otherwise its writer thread would wait for frames forever
+        if self.video_recorder is not None:
+            self._stop_video()
+        # Release the render window before the window closes, otherwise the interactor may outlive it
+        self.avatar_widget.Finalize()
+        super().closeEvent(event)
 
     def update_frame(self):
         """
-        Force the repaint of the window
+        Force the repaint of the window. The repaints asked while the events are processed (e.g. from a widget
+        callback) are merged into a single one
         """
+        if not self._render_pending:
+            self._render_pending = True
+            QTimer.singleShot(0, self._render)
+        app.processEvents()
+
+    def _render(self):
+        """
+        Repaint the window, resetting the camera beforehand if it was asked for
+        """
+        self._render_pending = False
+        if not self.is_active:
+            return
         if self.should_reset_camera:
             self.ren.ResetCamera()
             self.should_reset_camera = False
         self.interactor.Render()
-        app.processEvents()
 
     def change_background_color(self, color):
         """
@@ -120,33 +142,165 @@ class VtkWindow(QtWidgets.QMainWindow):
         self.setPalette(QPalette(QColor(int(color[0] * 255), int(color[1] * 255), int(color[2] * 255))))
 
     def record(self, finish=False, button_to_block=(), file_name=None):
-        windowToImageFilter = vtkWindowToImageFilter()
-        self.video_recorder.SetInputConnection(windowToImageFilter.GetOutputPort())
+        """
+        Add the current frame to the video. The frames are encoded by ffmpeg in a separate process, so it must be
+        installed and available in the PATH
+        Parameters
+        ----------
+        finish : bool
+            If the video should be closed after this frame
+        button_to_block : tuple(QPushButton)
+            The buttons to disable while the frame is grabbed
+        file_name : str
+            The name of the video file. Starts a new video when provided
+        """
+        # ffmpeg only stops once the video is finished, so if it already did, it failed (e.g. no libx264 or the file
+        # cannot be written)
+        if self.video_recorder is not None and (
+            self._video_error is not None or self.video_recorder.poll() is not None
+        ):
+            raise RuntimeError(f"ffmpeg could not record the video:\n{self._stop_video()}")
+
+        if file_name:
+            # The same filter is used for all the frames of the video so its image is not reallocated at each frame
+            self._video_image_filter = vtkWindowToImageFilter()
+            self._video_image_filter.SetInput(self.avatar_widget.GetRenderWindow())
+            self._video_image_filter.SetInputBufferTypeToRGB()
+            self._video_image_filter.ReadFrontBufferOff()
+
+        self._video_image_filter.Modified()
+        self._video_image_filter.Update()
+        image = self._video_image_filter.GetOutput()
+        width, height, _ = image.GetDimensions()
 
         if file_name:
-            self.video_recorder.SetFileName(file_name)
-            self.video_recorder.Start()
+            try:
+                self._start_video(file_name, width, height)
+            except RuntimeError:
+                self._video_image_filter = None
+                raise
             if not self.is_fixed_sized:
                 self.setFixedSize(self.size())
 
-        windowToImageFilter.SetInput(self.avatar_widget.GetRenderWindow())
-        windowToImageFilter.ReadFrontBufferOff()
-        windowToImageFilter.Update()
-
-        was_true = []
+        was_enabled = [b.isEnabled() for b in button_to_block]
         for b in button_to_block:
-            was_true.append(b.isEnabled())
             b.setEnabled(False)
-        self.video_recorder.Write()
-        for i, b in enumerate(button_to_block):
-            if was_true[i]:
+        # Copy the image in a free frame (vtk images start from the bottom row) so the filter can grab the next one
+        # while this one is sent to ffmpeg. This waits only if all the frames are still waiting to be encoded
+        frame = self._free_video_frames.get()
+        np.copyto(frame, numpy_support.vtk_to_numpy(image.GetPointData().GetScalars()).reshape(height, width, 3)[::-1])
+        self._video_frames.put(frame)
+        for b, enabled in zip(button_to_block, was_enabled):
+            if enabled:
                 b.setEnabled(True)
 
         if finish:
-            self.video_recorder.End()
-            if not self.is_fixed_sized:
-                self.setMinimumSize(self.minimum_size)
-                self.setMaximumSize(self.maximum_size)
+            error = self._stop_video()
+            if error is not None:
+                raise RuntimeError(f"ffmpeg could not record the video:\n{error}")
+
+    def _start_video(self, file_name, width, height):
+        """
+        Launch the ffmpeg process that encodes the raw frames sent by record into a video
+        Parameters
+        ----------
+        file_name : str
+            The name of the video file
+        width : int
+            Width of the frames in pixels
+        height : int
+            Height of the frames in pixels
+        """
+        try:
+            self.video_recorder = subprocess.Popen(
+                [
+                    "ffmpeg",
+                    "-y",
+                    "-loglevel",
+                    "error",
+                    "-f",
+                    "rawvideo",
+                    "-pix_fmt",
+                    "rgb24",
+                    "-s",
+                    f"{width}x{height}",
+                    "-i",
+                    "-",
+                    "-vf",
+                    "pad=ceil(iw/2)*2:ceil(ih/2)*2",  # libx264 requires even dimensions
+                    "-c:v",
+                    "libx264",
+                    "-pix_fmt",
+                    "yuv420p",
+                    file_name,
+                ],
+                stdin=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        except FileNotFoundError:
+            raise RuntimeError("ffmpeg must be installed to record a video")
+
+        # The frames are fed to ffmpeg by a separate thread so the window does not wait for the encoder. They are
+        # allocated once and recycled by the thread once sent, so they do not pile up in memory if the encoder is
+        # slower than the animation
+        self._video_error = None
+        self._video_frames = Queue()
+        self._free_video_frames = Queue()
+        for _ in range(8):
+            self._free_video_frames.put(np.empty((height, width, 3), dtype=np.uint8))
+        self._video_writer = Thread(
+            target=self._write_video, args=(self.video_recorder, self._video_frames, self._free_video_frames)
+        )
+        self._video_writer.start()
+
+    def _stop_video(self):
+        """
+        Send the remaining frames to ffmpeg and wait for it to finish the video
+        Returns
+        -------
+        The error reported by ffmpeg if the video could not be recorded, None otherwise
+        """
+        self._video_frames.put(None)
+        self._video_writer.join()
+        self.video_recorder.wait()
+        error = None
+        if self.video_recorder.returncode != 0 or self._video_error is not None:
+            error = self.video_recorder.stderr.read().decode(errors="replace").strip() or str(self._video_error)
+        self.video_recorder.stderr.close()
+        self.video_recorder = None
+        self._video_image_filter = None
+        if not self.is_fixed_sized:
+            self.setMinimumSize(self.minimum_size)
+            self.setMaximumSize(self.maximum_size)
+        return error
+
+    def _write_video(self, video_recorder, video_frames, free_video_frames):
+        """
+        Send the frames to ffmpeg until None is received. If ffmpeg stops, the error is kept for record to report and
+        the frames are still given back so record never waits for a free one
+        Parameters
+        ----------
+        video_recorder : subprocess.Popen
+            The ffmpeg process
+        video_frames : Queue
+            The frames to encode
+        free_video_frames : Queue
+            Where to put back the frames once sent
+        """
+        while True:
+            frame = video_frames.get()
+            if frame is None:
+                break
+            if self._video_error is None:
+                try:
+                    video_recorder.stdin.write(frame)
+                except OSError as e:
+                    self._video_error = e
+            free_video_frames.put(frame)
+        try:
+            video_recorder.stdin.close()
+        except OSError as e:
+            self._video_error = e
 
 
 class VtkModel(QtWidgets.QWidget):
@@ -182,6 +336,7 @@ class VtkModel(QtWidgets.QWidget):
         rt_width=2,
         force_color=(85, 78, 0),
         force_opacity=1.0,
+        high_fidelity_spheres=False,
     ):
         """
         Creates a model that will holds things to plot
@@ -197,9 +352,13 @@ class VtkModel(QtWidgets.QWidget):
             Opacity of the markers (0.0 is completely transparent, 1.0 completely opaque)
         rt_length : int
             Length of the axes of the system of axes
+        high_fidelity_spheres : bool
+            If the markers, contacts and centers of mass should be drawn as actual spheres instead of flat discs
+            shaded like spheres. This is slower when there are many points
         """
         QtWidgets.QWidget.__init__(self, parent)
         self.parent_window = parent
+        self.high_fidelity_spheres = high_fidelity_spheres
 
         palette = QPalette()
         palette.setColor(self.backgroundRole(), QColor(255, 255, 255))
@@ -210,19 +369,30 @@ class VtkModel(QtWidgets.QWidget):
         self.markers_size = markers_size
         self.markers_color = markers_color
         self.markers_opacity = markers_opacity
-        self.markers_actors = list()
+        self.markers_poly_data, self.markers_actor = self._new_sphere_cloud(
+            markers_size, markers_color, markers_opacity
+        )
+        self._markers_xyz = self._new_points(self.markers_poly_data, 0)
 
         self.contacts = Markers()
         self.contacts_size = contacts_size
         self.contacts_color = contacts_color
         self.contacts_opacity = contacts_opacity
-        self.contacts_actors = list()
+        self.contacts_poly_data, self.contacts_actor = self._new_sphere_cloud(
+            contacts_size, contacts_color, contacts_opacity
+        )
+        self._contacts_xyz = self._new_points(self.contacts_poly_data, 0)
 
         self.soft_contacts = Markers()
         self.soft_contacts_size = soft_contacts_size
         self.soft_contacts_color = soft_contacts_color
         self.soft_contacts_opacity = soft_contacts_opacity
-        self.soft_contacts_actors = list()
+        # The spheres have a unit radius and are scaled by the radius of each soft contact
+        self.soft_contacts_poly_data, self.soft_contacts_actor = self._new_sphere_cloud(
+            1, soft_contacts_color, soft_contacts_opacity, scale_array="radius"
+        )
+        self._soft_contacts_xyz = self._new_points(self.soft_contacts_poly_data, 0)
+        self._soft_contacts_radius = self._new_point_array(self.soft_contacts_poly_data, "radius", 0)
 
         self.has_global_ref_frame = False
         self.global_ref_frame_length = global_ref_frame_length
@@ -232,37 +402,83 @@ class VtkModel(QtWidgets.QWidget):
         self.global_center_of_mass_size = global_center_of_mass_size
         self.global_center_of_mass_color = global_center_of_mass_color
         self.global_center_of_mass_opacity = global_center_of_mass_opacity
-        self.global_center_of_mass_actors = list()
+        self.global_center_of_mass_poly_data, self.global_center_of_mass_actor = self._new_sphere_cloud(
+            global_center_of_mass_size, global_center_of_mass_color, global_center_of_mass_opacity
+        )
+        self._global_center_of_mass_xyz = self._new_points(self.global_center_of_mass_poly_data, 0)
 
         self.segments_center_of_mass = Markers()
         self.segments_center_of_mass_size = segments_center_of_mass_size
         self.segments_center_of_mass_color = segments_center_of_mass_color
         self.segments_center_of_mass_opacity = segments_center_of_mass_opacity
-        self.segments_center_of_mass_actors = list()
+        self.segments_center_of_mass_poly_data, self.segments_center_of_mass_actor = self._new_sphere_cloud(
+            segments_center_of_mass_size, segments_center_of_mass_color, segments_center_of_mass_opacity
+        )
+        self._segments_center_of_mass_xyz = self._new_points(self.segments_center_of_mass_poly_data, 0)
 
         self.all_rt = []
         self.n_rt = 0
         self.rt_length = rt_length
         self.rt_width = rt_width
         self.rt_actors = list()
+        self._rt_points = list()
+        self._rt_xyz = list()
         self.parent_window.should_reset_camera = True
 
+        # All the systems of axes are made of the same lines (from the origin (0) to the end of each axis (1, 2, 3))
+        # with the same colors (x in red, y in green, z in blue), so these are created once and shared
+        self._rt_lines = vtkCellArray()
+        for axis in range(3):
+            line = vtkLine()
+            line.GetPointIds().SetId(0, 0)
+            line.GetPointIds().SetId(1, axis + 1)
+            self._rt_lines.InsertNextCell(line)
+        self._rt_colors = vtkUnsignedCharArray()
+        self._rt_colors.SetNumberOfComponents(3)
+        self._rt_colors.InsertNextTuple([255, 0, 0])
+        self._rt_colors.InsertNextTuple([0, 255, 0])
+        self._rt_colors.InsertNextTuple([0, 0, 255])
+
         self.all_meshes = []
         self.mesh_color = mesh_color
         self.force_wireframe = force_wireframe
         self.patch_color = patch_color
         self.mesh_opacity = mesh_opacity
         self.mesh_actors = list()
+        self._mesh_points = list()
+        self._mesh_xyz = list()
 
         self.all_muscles = []
         self.muscle_color = muscle_color
         self.muscle_opacity = muscle_opacity
-        self.muscle_actors = list()
+        self._muscle_property = vtkProperty()
+        self._muscle_property.SetColor(muscle_color)
+        self._muscle_property.SetOpacity(muscle_opacity)
+        self._muscle_property.SetLineWidth(5)
+        # All the muscles are drawn by a single actor, the points of the muscle i being the rows
+        # _muscle_offsets[i]:_muscle_offsets[i + 1] of the points of the poly data
+        self.muscle_poly_data = vtkPolyData()
+        self.muscle_poly_data.SetPoints(vtkPoints())
+        self._muscle_xyz = self._new_points(self.muscle_poly_data, 0)
+        self._muscle_offsets = np.zeros(1, dtype=np.int64)
+        self._muscle_triangles = list()
+        mapper = vtkPolyDataMapper()
+        mapper.SetInputData(self.muscle_poly_data)
+        self.muscle_actor = vtkActor()
+        self.muscle_actor.SetMapper(mapper)
+        self.muscle_actor.SetProperty(self._muscle_property)
+        self.parent_window.ren.AddActor(self.muscle_actor)
 
         self.all_wrappings = []
         self.wrapping_color = wrapping_color
         self.wrapping_opacity = wrapping_opacity
         self.wrapping_actors = list()
+        self._wrapping_points = list()
+        self._wrapping_xyz = list()
+        self._wrapping_cells = list()
+        self._wrapping_property = vtkProperty()
+        self._wrapping_property.SetColor(wrapping_color)
+        self._wrapping_property.SetOpacity(wrapping_opacity)
 
         self.all_forces = []
         self.force_centers = []
@@ -277,6 +493,191 @@ class VtkModel(QtWidgets.QWidget):
         self.plane_source = []
         self.plane_actor = []
 
+    def _new_sphere_cloud(self, size, color, opacity, scale_array=None):
+        """
+        Create the pipeline that draws a sphere on each point of a cloud (markers, contacts, center of mass) using a
+        single actor. The points are later allocated by _new_points
+        Parameters
+        ----------
+        size : float
+            Radius of the spheres
+        color : tuple(int)
+            Color the spheres should be drawn (1 is max brightness)
+        opacity : float
+            Opacity of the spheres (0.0 is completely transparent, 1.0 completely opaque)
+        scale_array : str
+            Name of the point array the radius of each sphere is multiplied by (all the spheres have the same radius
+            if None)
+        Returns
+        -------
+        The poly data holding the points and the actor
+        """
+        poly_data = vtkPolyData()
+        poly_data.SetPoints(vtkPoints())
+
+        if self.high_fidelity_spheres:
+            # Draw a unit sphere on each point of the cloud (instantiated by the GPU, the geometry is not copied). The
+            # sphere is copied on every point of the cloud, so keep it coarse
+            sphere = vtkSphereSource()
+            sphere.SetRadius(1)
+            sphere.SetThetaResolution(8)
+            sphere.SetPhiResolution(8)
+            mapper = vtkGlyph3DMapper()
+            mapper.SetSourceConnection(sphere.GetOutputPort())
+            if scale_array is None:
+                mapper.SetScaleModeToNoDataScaling()
+            else:
+                mapper.SetScaleArray(scale_array)
+                mapper.SetScaleModeToScaleByMagnitude()
+        else:
+            # Draw each point as a single square facing the camera, which is cut and shaded so it looks like a sphere
+            mapper = vtkPointGaussianMapper()
+            mapper.EmissiveOff()
+            mapper.SetSplatShaderCode(
+                "//VTK::Color::Impl\n"
+                "float dist = dot(offsetVCVSOutput.xy, offsetVCVSOutput.xy);\n"
+                "if (dist > 1.0) {\n"
+                "  discard;\n"
+                "} else {\n"
+                "  float scale = (1.0 - dist);\n"
+                "  ambientColor *= scale;\n"
+                "  diffuseColor *= scale;\n"
+                "}\n"
+            )
+            if scale_array is not None:
+                mapper.SetScaleArray(scale_array)
+        mapper.SetInputData(poly_data)
+        mapper.SetScaleFactor(size)
+
+        actor = vtkActor()
+        actor.SetMapper(mapper)
+        actor.GetProperty().SetColor(color)
+        actor.GetProperty().SetOpacity(opacity)
+        self.parent_window.ren.AddActor(actor)
+
+        return poly_data, actor
+
+    @staticmethod
+    def _new_points(poly_data, n_points):
+        """
+        Allocate the coordinates of the points of a poly data. The returned array is shared with vtk (no copy is made),
+        so it must be kept alive for as long as the poly data is drawn. Single precision is plenty for drawing and
+        halves the amount of data sent to vtk
+        Parameters
+        ----------
+        poly_data : vtkPolyData
+            The poly data to allocate the points of
+        n_points : int
+            Number of points
+        Returns
+        -------
+        The (n_points x 3) array holding the coordinates of the points
+        """
+        xyz = np.zeros((n_points, 3), dtype=np.float32)
+        poly_data.GetPoints().SetData(numpy_support.numpy_to_vtk(xyz, deep=False))
+        return xyz
+
+    @staticmethod
+    def _new_point_array(poly_data, name, n_points):
+        """
+        Allocate a scalar value for each point of a poly data. As for _new_points, the returned array is shared with
+        vtk and must be kept alive for as long as the poly data is drawn
+        Parameters
+        ----------
+        poly_data : vtkPolyData
+            The poly data to allocate the values of
+        name : str
+            Name of the array in the point data of the poly data (an array with the same name is replaced)
+        n_points : int
+            Number of points
+        Returns
+        -------
+        The (n_points) array holding the values
+        """
+        values = np.zeros((n_points,), dtype=np.float32)
+        vtk_values = numpy_support.numpy_to_vtk(values, deep=False)
+        vtk_values.SetName(name)
+        poly_data.GetPointData().AddArray(vtk_values)
+        return values
+
+    @staticmethod
+    def _new_triangle_cells(triangles, close):
+        """
+        Create the cells drawing the triangles of a mesh, either as polygons or as closed lines
+        Parameters
+        ----------
+        triangles : np.ndarray
+            The (3 x n_triangles) indices of the vertices of each triangle
+        close : bool
+            If the first vertex should be repeated at the end of each cell, so the triangles can be drawn as lines
+        Returns
+        -------
+        The vtkCellArray holding one cell per triangle
+        """
+        # The whole connectivity is built at once, cell i holding the ids offsets[i]:offsets[i + 1] (id_0, id_1, id_2(,
+        # id_0)). It is built with the type of the vtk ids (int64 on most builds) so the arrays are used without copy
+        n_triangles = triangles.shape[1]
+        n_ids = 4 if close else 3
+        id_type = numpy_support.get_vtk_to_numpy_typemap()[numpy_support.VTK_ID_TYPE]
+        offsets = np.arange(0, (n_triangles + 1) * n_ids, n_ids, dtype=id_type)
+        connectivity = np.empty((n_triangles, n_ids), dtype=id_type)
+        connectivity[:, 0:3] = triangles.T
+        if close:
+            connectivity[:, 3] = triangles[0, :]
+
+        cells = vtkCellArray()
+        cells.SetData(
+            numpy_support.numpy_to_vtkIdTypeArray(offsets, deep=False),
+            numpy_support.numpy_to_vtkIdTypeArray(connectivity.ravel(), deep=False),
+        )
+        return cells
+
+    def _resize_actors(self, actors, n_actors, actor_property=None):
+        """
+        Resize a set of actors, reusing the ones already in the scene. Only the surplus actors are removed from the
+        scene and only the missing ones are created, each with its own (empty) vtkPolyDataMapper
+        Parameters
+        ----------
+        actors : list(vtkActor)
+            The actors currently in the scene
+        n_actors : int
+            Number of actors needed
+        actor_property : vtkProperty
+            The property shared by the created actors (each has its own if None)
+        Returns
+        -------
+        The list of the n_actors actors
+        """
+        for actor in actors[n_actors:]:
+            self.parent_window.ren.RemoveActor(actor)
+
+        new_actors = [vtkActor() for _ in range(len(actors), n_actors)]
+        for actor in new_actors:
+            actor.SetMapper(vtkPolyDataMapper())
+            if actor_property is not None:
+                actor.SetProperty(actor_property)
+            self.parent_window.ren.AddActor(actor)
+        return actors[:n_actors] + new_actors
+
+    @staticmethod
+    def _set_points(points, xyz, data):
+        """
+        Move the points of a poly data allocated by _new_points. Nothing is sent to vtk if the points did not move
+        Parameters
+        ----------
+        points : vtkPoints
+            The points of the poly data to move
+        xyz : np.ndarray
+            The coordinates returned by _new_points
+        data : Markers3d
+            One frame of the points
+        """
+        data = data.data[0:3].reshape(3, -1).T.astype(xyz.dtype)
+        if np.array_equal(xyz, data, equal_nan=True):
+            return
+        xyz[:] = data
+        points.Modified()
+
     def set_markers_color(self, markers_color):
         """
         Dynamically change the color of the markers
@@ -286,7 +687,7 @@ class VtkModel(QtWidgets.QWidget):
             Color the markers should be drawn (1 is max brightness)
         """
         self.markers_color = markers_color
-        self.update_markers(self.markers)
+        self.markers_actor.GetProperty().SetColor(markers_color)
 
     def set_markers_size(self, markers_size):
         """
@@ -297,7 +698,7 @@ class VtkModel(QtWidgets.QWidget):
             Size the markers should be drawn
         """
         self.markers_size = markers_size
-        self.update_markers(self.markers)
+        self.markers_actor.GetMapper().SetScaleFactor(markers_size)
 
     def set_markers_opacity(self, markers_opacity):
         """
@@ -311,7 +712,7 @@ class VtkModel(QtWidgets.QWidget):
 
         """
         self.markers_opacity = markers_opacity
-        self.update_markers(self.markers)
+        self.markers_actor.GetProperty().SetOpacity(markers_opacity)
 
     def new_marker_set(self, markers):
         """
@@ -322,28 +723,13 @@ class VtkModel(QtWidgets.QWidget):
             One frame of markers
 
         """
-        if markers.time.size != 1:
+        if markers.ndim > 2 and markers.shape[2] != 1:
             raise IndexError("Markers should be from one frame only")
         self.markers = markers
-
-        # Remove previous actors from the scene
-        for actor in self.markers_actors:
-            self.parent_window.ren.RemoveActor(actor)
-        self.markers_actors = list()
-
-        # Create the geometry of a point (the coordinate) points = vtk.vtkPoints()
-        for i in range(markers.channel.size):
-            # Create a mapper
-            mapper = vtkPolyDataMapper()
-
-            # Create an actor
-            self.markers_actors.append(vtkActor())
-            self.markers_actors[i].SetMapper(mapper)
-
-            self.parent_window.ren.AddActor(self.markers_actors[i])
+        self._markers_xyz = self._new_points(self.markers_poly_data, markers.shape[1])
 
         # Update marker position
-        self.update_markers(self.markers)
+        self._set_points(self.markers_poly_data.GetPoints(), self._markers_xyz, markers)
 
     def update_markers(self, markers):
         """
@@ -355,23 +741,13 @@ class VtkModel(QtWidgets.QWidget):
 
         """
 
-        if markers.time.size != 1:
+        if markers.ndim > 2 and markers.shape[2] != 1:
             raise IndexError("Markers should be from one frame only")
-        if markers.channel.size != self.markers.channel.size:
+        if markers.shape[1] != self._markers_xyz.shape[0]:
             self.new_marker_set(markers)
             return  # Prevent calling update_markers recursively
         self.markers = markers
-        markers = np.array(markers)
-
-        for i, actor in enumerate(self.markers_actors):
-            # mapper = actors.GetNextActor().GetMapper()
-            mapper = actor.GetMapper()
-            self.markers_actors[i].GetProperty().SetColor(self.markers_color)
-            self.markers_actors[i].GetProperty().SetOpacity(self.markers_opacity)
-            source = vtkSphereSource()
-            source.SetCenter(markers[0:3, i])
-            source.SetRadius(self.markers_size)
-            mapper.SetInputConnection(source.GetOutputPort())
+        self._set_points(self.markers_poly_data.GetPoints(), self._markers_xyz, markers)
 
     def set_contacts_color(self, contacts_color):
         """
@@ -382,7 +758,7 @@ class VtkModel(QtWidgets.QWidget):
             Color the contacts should be drawn (1 is max brightness)
         """
         self.contacts_color = contacts_color
-        self.update_contacts(self.contacts)
+        self.contacts_actor.GetProperty().SetColor(contacts_color)
 
     def set_contacts_size(self, contacts_size):
         """
@@ -393,7 +769,7 @@ class VtkModel(QtWidgets.QWidget):
             Size the contacts should be drawn
         """
         self.contacts_size = contacts_size
-        self.update_contacts(self.contacts)
+        self.contacts_actor.GetMapper().SetScaleFactor(contacts_size)
 
     def set_contacts_opacity(self, contacts_opacity):
         """
@@ -407,7 +783,7 @@ class VtkModel(QtWidgets.QWidget):
 
         """
         self.contacts_opacity = contacts_opacity
-        self.update_contacts(self.contacts)
+        self.contacts_actor.GetProperty().SetOpacity(contacts_opacity)
 
     def new_contact_set(self, contacts):
         """
@@ -418,28 +794,13 @@ class VtkModel(QtWidgets.QWidget):
             One frame of contacts
 
         """
-        if contacts.time.size != 1:
+        if contacts.ndim > 2 and contacts.shape[2] != 1:
             raise IndexError("Contacts should be from one frame only")
         self.contacts = contacts
-
-        # Remove previous actors from the scene
-        for actor in self.contacts_actors:
-            self.parent_window.ren.RemoveActor(actor)
-        self.contacts_actors = list()
-
-        # Create the geometry of a point (the coordinate) points = vtk.vtkPoints()
-        for i in range(contacts.channel.size):
-            # Create a mapper
-            mapper = vtkPolyDataMapper()
-
-            # Create an actor
-            self.contacts_actors.append(vtkActor())
-            self.contacts_actors[i].SetMapper(mapper)
-
-            self.parent_window.ren.AddActor(self.contacts_actors[i])
+        self._contacts_xyz = self._new_points(self.contacts_poly_data, contacts.shape[1])
 
         # Update marker position
-        self.update_contacts(self.contacts)
+        self._set_points(self.contacts_poly_data.GetPoints(), self._contacts_xyz, contacts)
 
     def update_contacts(self, contacts):
         """
@@ -451,23 +812,13 @@ class VtkModel(QtWidgets.QWidget):
 
         """
 
-        if contacts.time.size != 1:
+        if contacts.ndim > 2 and contacts.shape[2] != 1:
             raise IndexError("Contacts should be from one frame only")
-        if contacts.channel.size != self.contacts.channel.size:
+        if contacts.shape[1] != self._contacts_xyz.shape[0]:
             self.new_contact_set(contacts)
             return  # Prevent calling update_contacts recursively
         self.contacts = contacts
-        contacts = np.array(contacts)
-
-        for i, actor in enumerate(self.contacts_actors):
-            # mapper = actors.GetNextActor().GetMapper()
-            mapper = actor.GetMapper()
-            self.contacts_actors[i].GetProperty().SetColor(self.contacts_color)
-            self.contacts_actors[i].GetProperty().SetOpacity(self.contacts_opacity)
-            source = vtkSphereSource()
-            source.SetCenter(contacts[0:3, i])
-            source.SetRadius(self.contacts_size)
-            mapper.SetInputConnection(source.GetOutputPort())
+        self._set_points(self.contacts_poly_data.GetPoints(), self._contacts_xyz, contacts)
 
     def set_soft_contacts_color(self, soft_contacts_color):
         """
@@ -478,7 +829,7 @@ class VtkModel(QtWidgets.QWidget):
             Color the soft_contacts should be drawn (1 is max brightness)
         """
         self.soft_contacts_color = soft_contacts_color
-        self.update_soft_contacts(self.soft_contacts)
+        self.soft_contacts_actor.GetProperty().SetColor(soft_contacts_color)
 
     def set_soft_contacts_size(self, soft_contacts_size):
         """
@@ -489,7 +840,8 @@ class VtkModel(QtWidgets.QWidget):
             Size the soft_contacts should be drawn
         """
         self.soft_contacts_size = soft_contacts_size
-        self.update_soft_contacts(self.soft_contacts)
+        self._soft_contacts_radius[:] = soft_contacts_size
+        self.soft_contacts_poly_data.GetPointData().GetArray("radius").Modified()
 
     def set_soft_contacts_opacity(self, soft_contacts_opacity):
         """
@@ -503,7 +855,7 @@ class VtkModel(QtWidgets.QWidget):
 
         """
         self.soft_contacts_opacity = soft_contacts_opacity
-        self.update_soft_contacts(self.soft_contacts)
+        self.soft_contacts_actor.GetProperty().SetOpacity(soft_contacts_opacity)
 
     def new_soft_contacts_set(self, soft_contacts):
         """
@@ -514,27 +866,17 @@ class VtkModel(QtWidgets.QWidget):
             One frame of soft_contacts
 
         """
-        if soft_contacts.time.size != 1:
+        if soft_contacts.ndim > 2 and soft_contacts.shape[2] != 1:
             raise IndexError("soft_contacts should be from one frame only")
         self.soft_contacts = soft_contacts
+        self._soft_contacts_xyz = self._new_points(self.soft_contacts_poly_data, soft_contacts.shape[1])
+        self._soft_contacts_radius = self._new_point_array(
+            self.soft_contacts_poly_data, "radius", soft_contacts.shape[1]
+        )
+        self._soft_contacts_radius[:] = self.soft_contacts_size
 
-        # Remove previous actors from the scene
-        for actor in self.soft_contacts_actors:
-            self.parent_window.ren.RemoveActor(actor)
-        self.soft_contacts_actors = list()
-
-        # Create the geometry of a point (the coordinate) points = vtk.vtkPoints()
-        for i in range(soft_contacts.channel.size):
-            # Create a mapper
-            mapper = vtkPolyDataMapper()
-
-            # Create an actor
-            self.soft_contacts_actors.append(vtkActor())
-            self.soft_contacts_actors[i].SetMapper(mapper)
-
-            self.parent_window.ren.AddActor(self.soft_contacts_actors[i])
         # Update marker position
-        self.update_soft_contacts(self.soft_contacts)
+        self._set_points(self.soft_contacts_poly_data.GetPoints(), self._soft_contacts_xyz, soft_contacts)
 
     def update_soft_contacts(self, soft_contacts):
         """
@@ -546,23 +888,13 @@ class VtkModel(QtWidgets.QWidget):
 
         """
 
-        if soft_contacts.time.size != 1:
+        if soft_contacts.ndim > 2 and soft_contacts.shape[2] != 1:
             raise IndexError("soft_contacts should be from one frame only")
-        if soft_contacts.channel.size != self.soft_contacts.channel.size:
+        if soft_contacts.shape[1] != self._soft_contacts_xyz.shape[0]:
             self.new_soft_contacts_set(soft_contacts)
             return  # Prevent calling update_soft_contacts recursively
         self.soft_contacts = soft_contacts
-        soft_contacts = np.array(soft_contacts)
-
-        for i, actor in enumerate(self.soft_contacts_actors):
-            # mapper = actors.GetNextActor().GetMapper()
-            mapper = actor.GetMapper()
-            self.soft_contacts_actors[i].GetProperty().SetColor(self.soft_contacts_color)
-            self.soft_contacts_actors[i].GetProperty().SetOpacity(self.soft_contacts_opacity)
-            source = vtkSphereSource()
-            source.SetCenter(soft_contacts[0:3, i])
-            source.SetRadius(self.soft_contacts_size[i])
-            mapper.SetInputConnection(source.GetOutputPort())
+        self._set_points(self.soft_contacts_poly_data.GetPoints(), self._soft_contacts_xyz, soft_contacts)
 
     def set_global_center_of_mass_color(self, global_center_of_mass_color):
         """
@@ -573,7 +905,7 @@ class VtkModel(QtWidgets.QWidget):
             Color the center of mass should be drawn (1 is max brightness)
         """
         self.global_center_of_mass_color = global_center_of_mass_color
-        self.update_global_center_of_mass(self.global_center_of_mass)
+        self.global_center_of_mass_actor.GetProperty().SetColor(global_center_of_mass_color)
 
     def set_global_center_of_mass_size(self, global_center_of_mass_size):
         """
@@ -584,7 +916,7 @@ class VtkModel(QtWidgets.QWidget):
             Size the center of mass should be drawn
         """
         self.global_center_of_mass_size = global_center_of_mass_size
-        self.update_global_center_of_mass(self.global_center_of_mass)
+        self.global_center_of_mass_actor.GetMapper().SetScaleFactor(global_center_of_mass_size)
 
     def set_global_center_of_mass_opacity(self, global_center_of_mass_opacity):
         """
@@ -598,7 +930,7 @@ class VtkModel(QtWidgets.QWidget):
 
         """
         self.global_center_of_mass_opacity = global_center_of_mass_opacity
-        self.update_global_center_of_mass(self.global_center_of_mass)
+        self.global_center_of_mass_actor.GetProperty().SetOpacity(global_center_of_mass_opacity)
 
     def new_global_center_of_mass_set(self, global_center_of_mass):
         """
@@ -613,25 +945,14 @@ class VtkModel(QtWidgets.QWidget):
         if global_center_of_mass.channel.size != 1:
             raise IndexError("Global center of mass should be from one frame only")
         self.global_center_of_mass = global_center_of_mass
-
-        # Remove previous actors from the scene
-        for actor in self.global_center_of_mass_actors:
-            self.parent_window.ren.RemoveActor(actor)
-        self.global_center_of_mass_actors = list()
-
-        # Create the geometry of a point (the coordinate) points = vtk.vtkPoints()
-        for i in range(global_center_of_mass.channel.size):
-            # Create a mapper
-            mapper = vtkPolyDataMapper()
-
-            # Create an actor
-            self.global_center_of_mass_actors.append(vtkActor())
-            self.global_center_of_mass_actors[i].SetMapper(mapper)
-
-            self.parent_window.ren.AddActor(self.global_center_of_mass_actors[i])
+        self._global_center_of_mass_xyz = self._new_points(
+            self.global_center_of_mass_poly_data, global_center_of_mass.shape[1]
+        )
 
         # Update marker position
-        self.update_global_center_of_mass(self.global_center_of_mass)
+        self._set_points(
+            self.global_center_of_mass_poly_data.GetPoints(), self._global_center_of_mass_xyz, global_center_of_mass
+        )
 
     def update_global_center_of_mass(self, global_center_of_mass):
         """
@@ -643,22 +964,15 @@ class VtkModel(QtWidgets.QWidget):
 
         """
 
-        if global_center_of_mass.time.size != 1:
+        if global_center_of_mass.ndim > 2 and global_center_of_mass.shape[2] != 1:
             raise IndexError("Segment center of mass should be from one frame only")
-        if global_center_of_mass.channel.size != self.global_center_of_mass.channel.size:
+        if global_center_of_mass.shape[1] != self._global_center_of_mass_xyz.shape[0]:
             self.new_global_center_of_mass_set(global_center_of_mass)
             return  # Prevent calling update_center_of_mass recursively
         self.global_center_of_mass = global_center_of_mass
-
-        for i, actor in enumerate(self.global_center_of_mass_actors):
-            # mapper = actors.GetNextActor().GetMapper()
-            mapper = actor.GetMapper()
-            self.global_center_of_mass_actors[i].GetProperty().SetColor(self.global_center_of_mass_color)
-            self.global_center_of_mass_actors[i].GetProperty().SetOpacity(self.global_center_of_mass_opacity)
-            source = vtkSphereSource()
-            source.SetCenter(global_center_of_mass[0:3, i])
-            source.SetRadius(self.global_center_of_mass_size)
-            mapper.SetInputConnection(source.GetOutputPort())
+        self._set_points(
+            self.global_center_of_mass_poly_data.GetPoints(), self._global_center_of_mass_xyz, global_center_of_mass
+        )
 
     def set_segments_center_of_mass_color(self, segments_center_of_mass_color):
         """
@@ -669,7 +983,7 @@ class VtkModel(QtWidgets.QWidget):
             Color the center of mass should be drawn (1 is max brightness)
         """
         self.segments_center_of_mass_color = segments_center_of_mass_color
-        self.update_segments_center_of_mass(self.segments_center_of_mass)
+        self.segments_center_of_mass_actor.GetProperty().SetColor(segments_center_of_mass_color)
 
     def set_segments_center_of_mass_size(self, segments_center_of_mass_size):
         """
@@ -680,7 +994,7 @@ class VtkModel(QtWidgets.QWidget):
             Size the center of mass should be drawn
         """
         self.segments_center_of_mass_size = segments_center_of_mass_size
-        self.update_segments_center_of_mass(self.segments_center_of_mass)
+        self.segments_center_of_mass_actor.GetMapper().SetScaleFactor(segments_center_of_mass_size)
 
     def set_segments_center_of_mass_opacity(self, segments_center_of_mass_opacity):
         """
@@ -694,7 +1008,7 @@ class VtkModel(QtWidgets.QWidget):
 
         """
         self.segments_center_of_mass_opacity = segments_center_of_mass_opacity
-        self.update_segments_center_of_mass(self.segments_center_of_mass)
+        self.segments_center_of_mass_actor.GetProperty().SetOpacity(segments_center_of_mass_opacity)
 
     def new_segments_center_of_mass_set(self, segments_center_of_mass):
         """
@@ -706,28 +1020,19 @@ class VtkModel(QtWidgets.QWidget):
             One frame of segment center of mas
 
         """
-        if segments_center_of_mass.time.size != 1:
+        if segments_center_of_mass.ndim > 2 and segments_center_of_mass.shape[2] != 1:
             raise IndexError("Segments center of mass should be from one frame only")
         self.segments_center_of_mass = segments_center_of_mass
-
-        # Remove previous actors from the scene
-        for actor in self.segments_center_of_mass_actors:
-            self.parent_window.ren.RemoveActor(actor)
-        self.segments_center_of_mass_actors = list()
-
-        # Create the geometry of a point (the coordinate) points = vtk.vtkPoints()
-        for i in range(segments_center_of_mass.channel.size):
-            # Create a mapper
-            mapper = vtkPolyDataMapper()
-
-            # Create an actor
-            self.segments_center_of_mass_actors.append(vtkActor())
-            self.segments_center_of_mass_actors[i].SetMapper(mapper)
-
-            self.parent_window.ren.AddActor(self.segments_center_of_mass_actors[i])
+        self._segments_center_of_mass_xyz = self._new_points(
+            self.segments_center_of_mass_poly_data, segments_center_of_mass.shape[1]
+        )
 
         # Update marker position
-        self.update_segments_center_of_mass(self.segments_center_of_mass)
+        self._set_points(
+            self.segments_center_of_mass_poly_data.GetPoints(),
+            self._segments_center_of_mass_xyz,
+            segments_center_of_mass,
+        )
 
     def update_segments_center_of_mass(self, segments_center_of_mass):
         """
@@ -739,22 +1044,17 @@ class VtkModel(QtWidgets.QWidget):
 
         """
 
-        if segments_center_of_mass.time.size != 1:
+        if segments_center_of_mass.ndim > 2 and segments_center_of_mass.shape[2] != 1:
             raise IndexError("Segment center of mass should be from one frame only")
-        if segments_center_of_mass.channel.size != self.segments_center_of_mass.channel.size:
+        if segments_center_of_mass.shape[1] != self._segments_center_of_mass_xyz.shape[0]:
             self.new_segments_center_of_mass_set(segments_center_of_mass)
             return  # Prevent calling update_center_of_mass recursively
         self.segments_center_of_mass = segments_center_of_mass
-
-        for i, actor in enumerate(self.segments_center_of_mass_actors):
-            # mapper = actors.GetNextActor().GetMapper()
-            mapper = actor.GetMapper()
-            self.segments_center_of_mass_actors[i].GetProperty().SetColor(self.segments_center_of_mass_color)
-            self.segments_center_of_mass_actors[i].GetProperty().SetOpacity(self.segments_center_of_mass_opacity)
-            source = vtkSphereSource()
-            source.SetCenter(segments_center_of_mass[0:3, i])
-            source.SetRadius(self.segments_center_of_mass_size)
-            mapper.SetInputConnection(source.GetOutputPort())
+        self._set_points(
+            self.segments_center_of_mass_poly_data.GetPoints(),
+            self._segments_center_of_mass_xyz,
+            segments_center_of_mass,
+        )
 
     def set_mesh_color(self, mesh_color):
         """
@@ -799,60 +1099,35 @@ class VtkModel(QtWidgets.QWidget):
             raise TypeError("Please send a list of mesh to update_mesh")
         self.all_meshes = all_meshes
 
-        # Remove previous actors from the scene
-        for actor in self.mesh_actors:
-            self.parent_window.ren.RemoveActor(actor)
-        self.mesh_actors = list()
+        self.mesh_actors = self._resize_actors(self.mesh_actors, len(self.all_meshes))
+        self._mesh_points = list()
+        self._mesh_xyz = list()
 
         # Create the geometry of a point (the coordinate) points = vtkPoints()
         for (i, mesh) in enumerate(self.all_meshes):
-            if mesh.time.size != 1:
+            if mesh.ndim > 2 and mesh.shape[2] != 1:
                 raise IndexError("Mesh should be from one frame only")
 
-            points = vtkPoints()
-            for j in range(mesh.channel.size):
-                # points.InsertNextPoint([0, 0, 0])
-                points.InsertNextPoint(mesh.data[:3, j, 0].tolist())
-
             # Create an array for each triangle
             draw_patch = not mesh.automatic_triangles and not self.force_wireframe
-            if draw_patch:
-                poly_type = vtkPolygon
-                n_ids = 3
-                color = self.patch_color[i]
-            else:
-                poly_type = vtkPolyLine
-                n_ids = 4
-                color = self.mesh_color
-            cells = vtkCellArray()
-
-            # Create the polygons
-            for j in range(mesh.triangles.shape[1]):
-                poly = poly_type()
-                poly.GetPointIds().SetNumberOfIds(n_ids)  # make a tri
-                for k in range(len(mesh.triangles[:, j])):
-                    poly.GetPointIds().SetId(k, mesh.triangles[k, j])
-                if not draw_patch:
-                    poly.GetPointIds().SetId(3, mesh.triangles[0, j])  # Close the triangle
-                cells.InsertNextCell(poly)
+            color = self.patch_color[i] if draw_patch else self.mesh_color
+            cells = self._new_triangle_cells(mesh.triangles, close=not draw_patch)
 
+            points = vtkPoints()
             poly_data = vtkPolyData()
             poly_data.SetPoints(points)
+            self._mesh_points.append(points)
+            self._mesh_xyz.append(self._new_points(poly_data, mesh.channel.size))
             if draw_patch:
                 poly_data.SetPolys(cells)
             else:
                 poly_data.SetLines(cells)
 
-            mapper = vtkPolyDataMapper()
-            mapper.SetInputData(poly_data)
-
-            # Create an actor
-            self.mesh_actors.append(vtkActor())
-            self.mesh_actors[i].SetMapper(mapper)
-            self.mesh_actors[i].GetProperty().SetColor(color)
-            self.mesh_actors[i].GetProperty().SetOpacity(self.mesh_opacity)
-
-            self.parent_window.ren.AddActor(self.mesh_actors[i])
+            actor = self.mesh_actors[i]
+            actor.GetMapper().SetInputData(poly_data)
+            actor_property = actor.GetProperty()
+            actor_property.SetColor(color)
+            actor_property.SetOpacity(self.mesh_opacity)
 
         # Update marker position
         self.update_mesh(self.all_meshes)
@@ -871,11 +1146,15 @@ class VtkModel(QtWidgets.QWidget):
             mesh_tp.append(all_meshes)
             all_meshes = mesh_tp
 
+        if len(all_meshes) != len(self._mesh_xyz):
+            self.new_mesh_set(all_meshes)
+            return  # Prevent calling update_markers recursively
+
         for i, mesh in enumerate(all_meshes):
-            if mesh.time.size != 1:
+            if mesh.ndim > 2 and mesh.shape[2] != 1:
                 raise IndexError("Mesh should be from one frame only")
 
-            if len(self.all_meshes) <= i or mesh.channel.size != self.all_meshes[i].channel.size:
+            if mesh.shape[1] != self._mesh_xyz[i].shape[0]:
                 self.new_mesh_set(all_meshes)
                 return  # Prevent calling update_markers recursively
 
@@ -884,15 +1163,8 @@ class VtkModel(QtWidgets.QWidget):
 
         self.all_meshes = all_meshes
 
-        for (i, mesh) in enumerate(self.all_meshes):
-            points = vtkPoints()
-            n_vertex = mesh.channel.size
-            mesh = np.array(mesh)
-            for j in range(n_vertex):
-                points.InsertNextPoint(mesh[0:3, j])
-
-            poly_line = self.mesh_actors[i].GetMapper().GetInput()
-            poly_line.SetPoints(points)
+        for (points, xyz, mesh) in zip(self._mesh_points, self._mesh_xyz, self.all_meshes):
+            self._set_points(points, xyz, mesh)
 
     def set_muscle_color(self, muscle_color):
         """
@@ -903,7 +1175,7 @@ class VtkModel(QtWidgets.QWidget):
             Color the muscles should be drawn
         """
         self.muscle_color = muscle_color
-        self.update_muscles(self.all_muscles)
+        self._muscle_property.SetColor(muscle_color)
 
     def set_muscle_opacity(self, muscle_opacity):
         """
@@ -917,7 +1189,7 @@ class VtkModel(QtWidgets.QWidget):
 
         """
         self.muscle_opacity = muscle_opacity
-        self.update_muscle(self.all_muscles)
+        self._muscle_property.SetOpacity(muscle_opacity)
 
     def new_muscle_set(self, all_muscles):
         """
@@ -937,45 +1209,23 @@ class VtkModel(QtWidgets.QWidget):
             raise TypeError("Please send a list of muscle to update_muscle")
         self.all_muscles = all_muscles
 
-        # Remove previous actors from the scene
-        for actor in self.muscle_actors:
-            self.parent_window.ren.RemoveActor(actor)
-        self.muscle_actors = list()
-
-        # Create the geometry of a point (the coordinate) points = vtkPoints()
-        for (i, mesh) in enumerate(self.all_muscles):
-            if mesh.time.size != 1:
+        for mesh in self.all_muscles:
+            if mesh.ndim > 2 and mesh.shape[2] != 1:
                 raise IndexError("Muscles should be from one frame only")
 
-            points = vtkPoints()
-            for j in range(mesh.channel.size):
-                points.InsertNextPoint([0, 0, 0])
-
-            # Create an array for each triangle
-            cell = vtkCellArray()
-            for j in range(mesh.triangles.shape[1]):  # For each triangle
-                line = vtkPolyLine()
-                line.GetPointIds().SetNumberOfIds(4)
-                for k in range(len(mesh.triangles[:, j])):  # For each index
-                    line.GetPointIds().SetId(k, mesh.triangles[k, j])
-                line.GetPointIds().SetId(3, mesh.triangles[0, j])  # Close the triangle
-                cell.InsertNextCell(line)
-            poly_line = vtkPolyData()
-            poly_line.SetPoints(points)
-            poly_line.SetLines(cell)
-
-            # Create a mapper
-            mapper = vtkPolyDataMapper()
-            mapper.SetInputData(poly_line)
-
-            # Create an actor
-            self.muscle_actors.append(vtkActor())
-            self.muscle_actors[i].SetMapper(mapper)
-            self.muscle_actors[i].GetProperty().SetColor(self.muscle_color)
-            self.muscle_actors[i].GetProperty().SetOpacity(self.muscle_opacity)
-            self.muscle_actors[i].GetProperty().SetLineWidth(5)
+        # The lines only depend on the triangles and on where each muscle starts, so keep them if neither changed
+        offsets = np.cumsum([0] + [mesh.shape[1] for mesh in self.all_muscles], dtype=np.int64)
+        triangles = [mesh.triangles for mesh in self.all_muscles]
+        if not np.array_equal(offsets, self._muscle_offsets) or not all(
+            np.array_equal(new, old) for (new, old) in zip(triangles, self._muscle_triangles)
+        ):
+            all_triangles = [t + offset for (t, offset) in zip(triangles, offsets)]
+            all_triangles = np.concatenate(all_triangles, axis=1) if all_triangles else np.ndarray((3, 0), dtype=int)
+            self.muscle_poly_data.SetLines(self._new_triangle_cells(all_triangles, close=True))
+        self._muscle_offsets = offsets
+        self._muscle_triangles = triangles
 
-            self.parent_window.ren.AddActor(self.muscle_actors[i])
+        self._muscle_xyz = self._new_points(self.muscle_poly_data, offsets[-1])
 
         # Update marker position
         self.update_muscle(self.all_muscles)
@@ -994,28 +1244,31 @@ class VtkModel(QtWidgets.QWidget):
             musc_tp.append(all_muscles)
             all_muscles = musc_tp
 
-        for i, muscle in enumerate(all_muscles):
-            if muscle.time.size != 1:
+        for muscle in all_muscles:
+            if muscle.ndim > 2 and muscle.shape[2] != 1:
                 raise IndexError("Muscle should be from one frame only")
 
-            if len(self.all_muscles) <= i or muscle.channel.size != self.all_muscles[i].channel.size:
-                self.new_muscle_set(all_muscles)
-                return  # Prevent calling update_markers recursively
+        n_points = np.diff(self._muscle_offsets)
+        if len(all_muscles) != n_points.shape[0] or any(
+            muscle.shape[1] != n for (muscle, n) in zip(all_muscles, n_points)
+        ):
+            self.new_muscle_set(all_muscles)
+            return  # Prevent calling update_markers recursively
 
         if not isinstance(all_muscles, list):
             raise TypeError("Please send a list of muscles to update_muscle")
 
         self.all_muscles = all_muscles
+        if not self.all_muscles:
+            return
 
-        for (i, mesh) in enumerate(self.all_muscles):
-            points = vtkPoints()
-            n_vertex = mesh.channel.size
-            mesh = np.array(mesh)
-            for j in range(n_vertex):
-                points.InsertNextPoint(mesh[0:3, j])
-
-            poly_line = self.muscle_actors[i].GetMapper().GetInput()
-            poly_line.SetPoints(points)
+        # The muscles are gathered so they are compared and sent to vtk all at once
+        xyz = np.concatenate([muscle.data[0:3].reshape(3, -1) for muscle in self.all_muscles], axis=1).T
+        xyz = xyz.astype(self._muscle_xyz.dtype)
+        if np.array_equal(self._muscle_xyz, xyz, equal_nan=True):
+            return
+        self._muscle_xyz[:] = xyz
+        self.muscle_poly_data.GetPoints().Modified()
 
     def set_wrapping_color(self, wrapping_color):
         """
@@ -1026,7 +1279,7 @@ class VtkModel(QtWidgets.QWidget):
             Color the wrapping should be drawn (1 is max brightness)
         """
         self.wrapping_color = wrapping_color
-        self.update_wrapping(self.all_wrappings)
+        self._wrapping_property.SetColor(wrapping_color)
 
     def set_wrapping_opacity(self, wrapping_opacity):
         """
@@ -1040,7 +1293,7 @@ class VtkModel(QtWidgets.QWidget):
 
         """
         self.wrapping_opacity = wrapping_opacity
-        self.update_wrapping(self.all_wrappings)
+        self._wrapping_property.SetOpacity(wrapping_opacity)
 
     def new_wrapping_set(self, all_wrappings, seg):
         """
@@ -1060,44 +1313,37 @@ class VtkModel(QtWidgets.QWidget):
             raise TypeError("Please send a list of wrapping to update_wrapping")
         self.all_wrappings[seg] = all_wrappings
 
-        # Remove previous actors from the scene
-        for actor in self.wrapping_actors[seg]:
-            self.parent_window.ren.RemoveActor(actor)
-        self.wrapping_actors[seg] = list()
+        self.wrapping_actors[seg] = self._resize_actors(
+            self.wrapping_actors[seg], len(self.all_wrappings[seg]), self._wrapping_property
+        )
 
         # Create the geometry of a point (the coordinate) points = vtkPoints()
+        wrapping_points = list()
+        wrapping_xyz = list()
+        wrapping_cells = list()
         for (i, wrapping) in enumerate(self.all_wrappings[seg]):
-            if wrapping.time.size != 1:
+            if wrapping.ndim > 2 and wrapping.shape[2] != 1:
                 raise IndexError("Mesh should be from one frame only")
 
-            points = vtkPoints()
-            for j in range(wrapping.channel.size):
-                points.InsertNextPoint([0, 0, 0])
+            # The lines only depend on the triangles, so keep those of the previous set if the triangles did not change
+            if i < len(self._wrapping_cells[seg]) and np.array_equal(
+                self._wrapping_cells[seg][i][0], wrapping.triangles
+            ):
+                cell = self._wrapping_cells[seg][i][1]
+            else:
+                cell = self._new_triangle_cells(wrapping.triangles, close=True)
+            wrapping_cells.append((wrapping.triangles, cell))
 
-            # Create an array for each triangle
-            cell = vtkCellArray()
-            for j in range(wrapping.triangles.shape[1]):  # For each triangle
-                line = vtkPolyLine()
-                line.GetPointIds().SetNumberOfIds(4)
-                for k in range(len(wrapping.triangles[:, j])):  # For each index
-                    line.GetPointIds().SetId(k, wrapping.triangles[k, j])
-                line.GetPointIds().SetId(3, wrapping.triangles[0, j])  # Close the triangle
-                cell.InsertNextCell(line)
+            points = vtkPoints()
             poly_line = vtkPolyData()
             poly_line.SetPoints(points)
+            wrapping_points.append(points)
+            wrapping_xyz.append(self._new_points(poly_line, wrapping.shape[1]))
             poly_line.SetLines(cell)
-
-            # Create a mapper
-            mapper = vtkPolyDataMapper()
-            mapper.SetInputData(poly_line)
-
-            # Create an actor
-            self.wrapping_actors[seg].append(vtkActor())
-            self.wrapping_actors[seg][i].SetMapper(mapper)
-            self.wrapping_actors[seg][i].GetProperty().SetColor(self.wrapping_color)
-            self.wrapping_actors[seg][i].GetProperty().SetOpacity(self.wrapping_opacity)
-
-            self.parent_window.ren.AddActor(self.wrapping_actors[seg][i])
+            self.wrapping_actors[seg][i].GetMapper().SetInputData(poly_line)
+        self._wrapping_points[seg] = wrapping_points
+        self._wrapping_xyz[seg] = wrapping_xyz
+        self._wrapping_cells[seg] = wrapping_cells
 
         # # Update marker position
         # self.update_wrapping(self.all_wrappings)
@@ -1112,35 +1358,30 @@ class VtkModel(QtWidgets.QWidget):
 
         """
         if not self.all_wrappings:
-            self.all_wrappings = [[]] * len(all_wrappings)
-            self.wrapping_actors = [[]] * len(all_wrappings)
+            # Each segment needs its own lists (multiplying a list would make all the segments share the same one)
+            self.all_wrappings = [[] for _ in all_wrappings]
+            self.wrapping_actors = [[] for _ in all_wrappings]
+            self._wrapping_points = [[] for _ in all_wrappings]
+            self._wrapping_xyz = [[] for _ in all_wrappings]
+            self._wrapping_cells = [[] for _ in all_wrappings]
 
         for seg, wrappings in enumerate(all_wrappings):
+            # The list of wrappings of the segment is validated by new_wrapping_set when it is first seen or changes
+            if len(wrappings) != len(self._wrapping_xyz[seg]):
+                self.new_wrapping_set(wrappings, seg)
             for i, wrapping in enumerate(wrappings):
-                if wrapping.time.size != 1:
+                if wrapping.ndim > 2 and wrapping.shape[2] != 1:
                     raise IndexError("Mesh should be from one frame only")
 
-                if (
-                    len(self.all_wrappings[seg]) <= i
-                    or wrapping.channel.size != self.all_wrappings[seg][i].channel.size
-                ):
+                if wrapping.shape[1] != self._wrapping_xyz[seg][i].shape[0]:
                     self.new_wrapping_set(wrappings, seg)
-                    # return  # Prevent calling update_markers recursively
-
-            if not isinstance(wrappings, list):
-                raise TypeError("Please send a list of wrapping to update_wrapping")
 
             self.all_wrappings[seg] = wrappings
 
-            for (i, wrapping) in enumerate(self.all_wrappings[seg]):
-                points = vtkPoints()
-                n_vertex = wrapping.channel.size
-                wrapping = np.array(wrapping)
-                for j in range(n_vertex):
-                    points.InsertNextPoint(wrapping[0:3, j])
-
-                poly_line = self.wrapping_actors[seg][i].GetMapper().GetInput()
-                poly_line.SetPoints(points)
+            for (points, xyz, wrapping) in zip(
+                self._wrapping_points[seg], self._wrapping_xyz[seg], self.all_wrappings[seg]
+            ):
+                self._set_points(points, xyz, wrapping)
 
     def new_rt_set(self, all_rt):
         """
@@ -1159,69 +1400,35 @@ class VtkModel(QtWidgets.QWidget):
         if not isinstance(all_rt, list):
             raise TypeError("Please send a list of rt to new_rt_set")
 
-        # Remove previous actors from the scene
-        for actor in self.rt_actors:
-            self.parent_window.ren.RemoveActor(actor)
-        self.rt_actors = list()
+        n_rt_in_scene = len(self.rt_actors)
+        self.rt_actors = self._resize_actors(self.rt_actors, len(all_rt))
+        self._rt_points = self._rt_points[: len(all_rt)]
+        self._rt_xyz = self._rt_xyz[: len(all_rt)]
 
         for i, rt in enumerate(all_rt):
-            if rt.time.size != 1:
+            if rt.ndim > 2 and rt.shape[2] != 1:
                 raise IndexError("RT should be from one frame only")
+            if i < n_rt_in_scene:
+                continue  # All the systems of axes share the same topology, so the ones in the scene are kept as is
 
             # Create the polyline which will hold the actors
             lines_poly_data = vtkPolyData()
 
             # Create four points of a generic system of axes
-            pts = vtkPoints()
-            pts.InsertNextPoint([0, 0, 0])
-            pts.InsertNextPoint([1, 0, 0])
-            pts.InsertNextPoint([0, 1, 0])
-            pts.InsertNextPoint([0, 0, 1])
-            lines_poly_data.SetPoints(pts)
-
-            # Create the first line(between Origin and P0)
-            line0 = vtkLine()
-            line0.GetPointIds().SetId(0, 0)
-            line0.GetPointIds().SetId(1, 1)
-
-            # Create the second line(between Origin and P1)
-            line1 = vtkLine()
-            line1.GetPointIds().SetId(0, 0)
-            line1.GetPointIds().SetId(1, 2)
-
-            # Create the second line(between Origin and P1)
-            line2 = vtkLine()
-            line2.GetPointIds().SetId(0, 0)
-            line2.GetPointIds().SetId(1, 3)
-
-            # Create a vtkCellArray container and store the lines in it
-            lines = vtkCellArray()
-            lines.InsertNextCell(line0)
-            lines.InsertNextCell(line1)
-            lines.InsertNextCell(line2)
-
-            # Add the lines to the polydata container
-            lines_poly_data.SetLines(lines)
-
-            # Create a vtkUnsignedCharArray container and store the colors in it
-            colors = vtkUnsignedCharArray()
-            colors.SetNumberOfComponents(3)
-            colors.InsertNextTuple([255, 0, 0])
-            colors.InsertNextTuple([0, 255, 0])
-            colors.InsertNextTuple([0, 0, 255])
-            lines_poly_data.GetCellData().SetScalars(colors)
+            points = vtkPoints()
+            lines_poly_data.SetPoints(points)
+            xyz = self._new_points(lines_poly_data, 4)
+            xyz[1:, :] = np.eye(3)
+            self._rt_points.append(points)
+            self._rt_xyz.append(xyz)
 
-            # Create a mapper
-            mapper = vtkPolyDataMapper()
-            mapper.SetInputData(lines_poly_data)
+            # Add the lines and their colors, shared by all the systems of axes
+            lines_poly_data.SetLines(self._rt_lines)
+            lines_poly_data.GetCellData().SetScalars(self._rt_colors)
 
-            # Create an actor
-            self.rt_actors.append(vtkActor())
-            self.rt_actors[i].SetMapper(mapper)
+            self.rt_actors[i].GetMapper().SetInputData(lines_poly_data)
             self.rt_actors[i].GetProperty().SetLineWidth(self.rt_width)
 
-            self.parent_window.ren.AddActor(self.rt_actors[i])
-
         # Set rt orientations
         self.n_rt = len(all_rt)
         self.update_rt(all_rt)
@@ -1249,20 +1456,15 @@ class VtkModel(QtWidgets.QWidget):
 
         self.all_rt = all_rt
 
-        for i, rt in enumerate(self.all_rt):
-            if rt.time.size != 1:
+        for (points, xyz, rt) in zip(self._rt_points, self._rt_xyz, self.all_rt):
+            if rt.ndim > 2 and rt.shape[2] != 1:
                 raise IndexError("RT should be from one frame only")
 
-            # Update the end points of the axes and the origin
-            pts = vtkPoints()
-            pts.InsertNextPoint(rt.meca.translation)
-            pts.InsertNextPoint(rt.meca.translation + rt.isel(col=0)[0:3] * self.rt_length)
-            pts.InsertNextPoint(rt.meca.translation + rt.isel(col=1)[0:3] * self.rt_length)
-            pts.InsertNextPoint(rt.meca.translation + rt.isel(col=2)[0:3] * self.rt_length)
-
-            # Update polydata in mapper
-            lines_poly_data = self.rt_actors[i].GetMapper().GetInput()
-            lines_poly_data.SetPoints(pts)
+            # Update the origin and the end points of the axes (origin + each column of the rotation)
+            matrix = rt.data.reshape(4, 4)
+            xyz[:] = matrix[:3, 3]
+            xyz[1:] += matrix[:3, :3].T * self.rt_length
+            points.Modified()
 
     def create_global_ref_frame(self):
         """
@@ -1282,44 +1484,13 @@ class VtkModel(QtWidgets.QWidget):
         lines_poly_data = vtkPolyData()
 
         # Create four points of a generic system of axes
-        pts = vtkPoints()
-        pts.InsertNextPoint([0, 0, 0])
-        pts.InsertNextPoint([self.global_ref_frame_length, 0, 0])
-        pts.InsertNextPoint([0, self.global_ref_frame_length, 0])
-        pts.InsertNextPoint([0, 0, self.global_ref_frame_length])
-        lines_poly_data.SetPoints(pts)
-
-        # Create the first line(between Origin and P0)
-        line0 = vtkLine()
-        line0.GetPointIds().SetId(0, 0)
-        line0.GetPointIds().SetId(1, 1)
-
-        # Create the second line(between Origin and P1)
-        line1 = vtkLine()
-        line1.GetPointIds().SetId(0, 0)
-        line1.GetPointIds().SetId(1, 2)
-
-        # Create the second line(between Origin and P1)
-        line2 = vtkLine()
-        line2.GetPointIds().SetId(0, 0)
-        line2.GetPointIds().SetId(1, 3)
-
-        # Create a vtkCellArray container and store the lines in it
-        lines = vtkCellArray()
-        lines.InsertNextCell(line0)
-        lines.InsertNextCell(line1)
-        lines.InsertNextCell(line2)
-
-        # Add the lines to the polydata container
-        lines_poly_data.SetLines(lines)
-
-        # Create a vtkUnsignedCharArray container and store the colors in it
-        colors = vtkUnsignedCharArray()
-        colors.SetNumberOfComponents(3)
-        colors.InsertNextTuple([255, 0, 0])
-        colors.InsertNextTuple([0, 255, 0])
-        colors.InsertNextTuple([0, 0, 255])
-        lines_poly_data.GetCellData().SetScalars(colors)
+        lines_poly_data.SetPoints(vtkPoints())
+        self._global_ref_frame_xyz = self._new_points(lines_poly_data, 4)
+        self._global_ref_frame_xyz[1:, :] = np.eye(3) * self.global_ref_frame_length
+
+        # Add the lines and their colors, shared by all the systems of axes
+        lines_poly_data.SetLines(self._rt_lines)
+        lines_poly_data.GetCellData().SetScalars(self._rt_colors)
 
         # Create a mapper
         mapper = vtkPolyDataMapper()
@@ -1388,21 +1559,19 @@ class VtkModel(QtWidgets.QWidget):
         # Remove previous actors from the scene
         for actor in self.force_actors:
             self.parent_window.ren.RemoveActor(actor)
-        self.force_actors = list()
+        self.force_actors = [vtkActor() for _ in all_forces]
 
         for i, forces in enumerate(all_forces):
             # Create a mapper
             mapper = vtkPolyDataMapper()
             mapper.SetInputConnection(transform_polydata.GetOutputPort())
 
-            # Create an actor
-            self.force_actors.append(vtkActor())
+            # Set up the actor
             self.force_actors[i].SetMapper(mapper)
             self.force_actors[i].GetProperty().SetColor(self.force_color)
             self.force_actors[i].GetProperty().SetOpacity(self.force_opacity)
 
             self.parent_window.ren.AddActor(self.force_actors[i])
-            # self.parent_window.ren.ResetCamera()
 
         # Set rt orientations
         self.n_force = len(all_forces)
@@ -1477,6 +1646,7 @@ class VtkModel(QtWidgets.QWidget):
 
         self.max_forces = max_forces
         self.all_forces = all_forces
+        arrow_output = self.arrow_source.GetOutputPort()
         for i, forces in enumerate(all_forces):
             # Express force from current segment basis to global basis
             rot_seg = segment_jcs[i][:3, :3]
@@ -1496,17 +1666,16 @@ class VtkModel(QtWidgets.QWidget):
             transform.Concatenate(matrix)
             transform.Scale(length, length, length)
 
-            # Create an actor
-            mapper = self.force_actors[i].GetMapper()
+            # Update the actor
+            actor = self.force_actors[i]
             transform_polydata = vtkTransformPolyDataFilter()
             transform_polydata.SetTransform(transform)
-            transform_polydata.SetInputConnection(self.arrow_source.GetOutputPort())
+            transform_polydata.SetInputConnection(arrow_output)
+            actor.GetMapper().SetInputConnection(transform_polydata.GetOutputPort())
 
-            mapper.SetInputConnection(transform_polydata.GetOutputPort())
-
-            self.force_actors[i].SetMapper(mapper)
-            self.force_actors[i].GetProperty().SetColor(self.force_color)
-            self.force_actors[i].GetProperty().SetOpacity(self.force_opacity)
+            actor_property = actor.GetProperty()
+            actor_property.SetColor(self.force_color)
+            actor_property.SetOpacity(self.force_opacity)
 
     def new_gravity_vector(self, segment_rt, gravity, length, normalization_ratio, vector_color):
         """
@@ -15,9 +15,32 @@ class Mesh(Markers):
         automatic_triangles = False
         if s[1] == 0 and vertex.shape[1] > 0:
             automatic_triangles = True
-            triangles = np.ndarray((3, vertex.shape[1] - 1), dtype="int")
-            for i in range(vertex.shape[1] - 1):
-                triangles[:, i] = [i, i + 1, i]
+            idx = np.arange(vertex.shape[1] - 1, dtype="int")
+            triangles = np.array([idx, idx + 1, idx])
 
         attrs = {"triangles": triangles, "automatic_triangles": automatic_triangles}
         return Markers.__new__(cls, vertex, None, None, attrs=attrs, **kwargs)
+
+
+def merge_duplicated_vertices(vertices, triangles):
+    """
+    Merge the vertices sharing the same coordinates. Meshes converted from triangle soups (e.g. stl) hold a copy of a
+    vertex for each triangle sharing it. This is only valid for rigid meshes, whose merged vertices never move apart
+    Parameters
+    ----------
+    vertices : np.ndarray
+        The (3 or 4 x n_vertices x n_frames) coordinates of the vertices. The duplicates are found on the first frame
+    triangles : np.ndarray
+        The (3 x n_triangles) indices of the vertices of each triangle
+    Returns
+    -------
+    The merged vertices, the triangles pointing to them and the index of the kept vertices in the original ones (None
+    if nothing was merged, the vertices and triangles then being returned as is)
+    """
+    if triangles.shape[1] == 0:
+        return vertices, triangles, None
+
+    _, vertex_index, inverse = np.unique(vertices[0:3, :, 0].T, axis=0, return_index=True, return_inverse=True)
+    if vertex_index.shape[0] == vertices.shape[1]:
+        return vertices, triangles, None
+    return vertices[:, vertex_index, :], inverse.ravel()[triangles].astype(triangles.dtype), vertex_index
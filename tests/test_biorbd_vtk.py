@@ -0,0 +1,120 @@
+import os
+from unittest import mock
+
+import numpy as np
+import pytest
+from pyomeca import Markers
+from vtk.util import numpy_support
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from bioviz.biorbd_vtk import VtkWindow, VtkModel, Mesh
+
+
+def points_of(poly_data):
+    return numpy_support.vtk_to_numpy(poly_data.GetPoints().GetData())
+
+
+def test_update_markers_from_one_frame():
+    window = VtkWindow()
+    model = VtkModel(window)
+
+    # With and without time coordinates, with a different number of markers so the set is rebuilt from that frame
+    for markers in (Markers(np.random.rand(3, 5, 10), time=np.arange(10) / 100), Markers(np.random.rand(3, 6, 10))):
+        # A frame taken with an integer index has no time axis anymore
+        model.update_markers(markers[:, :, 2])
+        np.testing.assert_allclose(points_of(model.markers_poly_data), markers.data[0:3, :, 2].T, rtol=1e-6)
+
+        model.update_markers(markers[:, :, 3:4])
+        np.testing.assert_allclose(points_of(model.markers_poly_data), markers.data[0:3, :, 3].T, rtol=1e-6)
+
+        with pytest.raises(IndexError):
+            model.update_markers(markers[:, :, 3:5])
+    window.close()
+
+
+def muscle_lines(n_points):
+    # The automatic triangles of a muscle [i, i + 1, i] are drawn as closed lines, shifted by where the muscle starts
+    start = np.cumsum([0] + n_points[:-1])
+    return [[s + i, s + i + 1, s + i, s + i] for (s, n) in zip(start, n_points) for i in range(n - 1)]
+
+
+def test_update_muscle():
+    window = VtkWindow()
+    model = VtkModel(window)
+
+    # Grow, shrink and empty the set of muscles
+    for n_points in ([3, 4], [3, 4, 2], [5], []):
+        muscles = [Mesh(vertex=np.random.rand(3, n, 1)) for n in n_points]
+        model.update_muscle(muscles)
+
+        xyz = (
+            np.concatenate([muscle.data[0:3, :, 0] for muscle in muscles], axis=1).T if muscles else np.ndarray((0, 3))
+        )
+        np.testing.assert_allclose(points_of(model.muscle_poly_data), xyz, rtol=1e-6)
+        connectivity = numpy_support.vtk_to_numpy(model.muscle_poly_data.GetLines().GetConnectivityArray())
+        np.testing.assert_array_equal(connectivity.reshape(-1, 4), np.reshape(muscle_lines(n_points), (-1, 4)))
+
+    # The same frame is not sent again to vtk
+    muscles = [Mesh(vertex=np.random.rand(3, 3, 1)), Mesh(vertex=np.random.rand(3, 4, 1))]
+    model.update_muscle(muscles)
+    points_time = model.muscle_poly_data.GetPoints().GetMTime()
+    lines = model.muscle_poly_data.GetLines()
+    model.update_muscle(muscles)
+    assert model.muscle_poly_data.GetPoints().GetMTime() == points_time
+    assert model.muscle_poly_data.GetLines() is lines
+
+    # Moving a muscle sends the whole frame, but keeps the lines
+    muscles[1][0:3, :, :] = np.random.rand(3, 4, 1)
+    model.update_muscle(muscles)
+    assert model.muscle_poly_data.GetPoints().GetMTime() > points_time
+    assert model.muscle_poly_data.GetLines() is lines
+    np.testing.assert_allclose(points_of(model.muscle_poly_data)[3:], muscles[1].data[0:3, :, 0].T, rtol=1e-6)
+
+    # Frames without a time axis are accepted as well
+    muscles = [Mesh(vertex=np.random.rand(3, 3, 1))[:, :, 0], Mesh(vertex=np.random.rand(3, 4, 1))[:, :, 0]]
+    model.update_muscle(muscles)
+    np.testing.assert_allclose(points_of(model.muscle_poly_data)[3:], muscles[1].data[0:3, :].T, rtol=1e-6)
+    assert model.muscle_poly_data.GetLines() is lines
+
+    # Including when they change the set of muscles
+    muscles = [Mesh(vertex=np.random.rand(3, 2, 1))[:, :, 0], Mesh(vertex=np.random.rand(3, 4, 1))[:, :, 0]]
+    model.update_muscle(muscles)
+    np.testing.assert_allclose(points_of(model.muscle_poly_data)[2:], muscles[1].data[0:3, :].T, rtol=1e-6)
+    window.close()
+
+
+def test_update_mesh():
+    window = VtkWindow()
+    model = VtkModel(window, patch_color=[(0.8, 0.8, 0.8)] * 3)
+    n_actors = window.ren.GetActors().GetNumberOfItems()
+
+    # Shrinking the set of meshes removes the surplus actors from the scene
+    for n_meshes in (3, 1, 2):
+        meshes = [Mesh(vertex=np.random.rand(3, 4, 1), triangles=[[0, 1], [1, 2], [2, 3]]) for _ in range(n_meshes)]
+        model.update_mesh(meshes)
+        assert len(model.mesh_actors) == n_meshes
+        assert window.ren.GetActors().GetNumberOfItems() == n_actors + n_meshes
+        for actor, mesh in zip(model.mesh_actors, meshes):
+            np.testing.assert_allclose(points_of(actor.GetMapper().GetInput()), mesh.data[0:3, :, 0].T, rtol=1e-6)
+    window.close()
+
+
+def test_new_triangle_cells():
+    triangles = np.array([[0, 1, 2], [2, 3, 0]]).T
+
+    for close, offsets, connectivity in (
+        (True, [0, 4, 8], [0, 1, 2, 0, 2, 3, 0, 2]),
+        (False, [0, 3, 6], [0, 1, 2, 2, 3, 0]),
+    ):
+        with mock.patch.object(
+            numpy_support, "numpy_to_vtkIdTypeArray", wraps=numpy_support.numpy_to_vtkIdTypeArray
+        ) as to_vtk:
+            cells = VtkModel._new_triangle_cells(triangles, close=close)
+        assert cells.GetNumberOfCells() == 2
+        np.testing.assert_array_equal(numpy_support.vtk_to_numpy(cells.GetOffsetsArray()), offsets)
+        np.testing.assert_array_equal(numpy_support.vtk_to_numpy(cells.GetConnectivityArray()), connectivity)
+
+        # vtk uses the arrays built by bioviz as is, without converting them
+        built_offsets, built_connectivity = (call.args[0] for call in to_vtk.call_args_list)
+        assert np.shares_memory(numpy_support.vtk_to_numpy(cells.GetOffsetsArray()), built_offsets)
+        assert np.shares_memory(numpy_support.vtk_to_numpy(cells.GetConnectivityArray()), built_connectivity)
@@ -0,0 +1,40 @@
+import numpy as np
+
+from bioviz.mesh import merge_duplicated_vertices
+
+
+def test_merge_duplicated_vertices():
+    # Two triangles of a square, each holding its own copy of the shared corners (1, 0, 0) and (0, 1, 0)
+    vertices = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]], dtype=float).T
+    vertices = np.concatenate((vertices, np.ones((1, 6))))[:, :, np.newaxis]
+    triangles = np.array([[0, 1, 2], [3, 4, 5]], dtype="int32").T
+
+    merged_vertices, merged_triangles, vertex_index = merge_duplicated_vertices(vertices, triangles)
+
+    assert merged_vertices.shape == (4, 4, 1)
+    assert merged_triangles.shape == triangles.shape
+    assert merged_triangles.dtype == triangles.dtype
+    np.testing.assert_array_equal(merged_vertices, vertices[:, vertex_index, :])
+    np.testing.assert_array_equal(merged_vertices[:, merged_triangles, :], vertices[:, triangles, :])
+
+
+def test_merge_duplicated_vertices_without_duplicates():
+    vertices = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0]], dtype=float).T[:, :, np.newaxis]
+    triangles = np.array([[0, 1, 2], [1, 3, 2]], dtype="int32").T
+
+    merged_vertices, merged_triangles, vertex_index = merge_duplicated_vertices(vertices, triangles)
+
+    assert vertex_index is None
+    assert merged_vertices is vertices
+    assert merged_triangles is triangles
+
+
+def test_merge_duplicated_vertices_without_triangles():
+    vertices = np.array([[0, 0, 0], [0, 0, 0], [1, 0, 0]], dtype=float).T[:, :, np.newaxis]
+    triangles = np.ndarray((3, 0), dtype="int32")
+
+    merged_vertices, merged_triangles, vertex_index = merge_duplicated_vertices(vertices, triangles)
+
+    assert vertex_index is None
+    assert merged_vertices is vertices
+    assert merged_triangles is triangles